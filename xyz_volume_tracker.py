@@ -24,14 +24,30 @@ import sys
 import requests
 import json
 import time
+import heapq
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from collections import defaultdict
+import threading
 import os
 
 # Hyperliquid API endpoints
 API_URL = "https://api.hyperliquid.xyz/info"
 
+# One session per thread so repeated /info calls reuse a keep-alive connection
+# without sharing a Session across threads (requests doesn't guarantee that's safe)
+_thread_local = threading.local()
+
+def _get_session() -> requests.Session:
+    """Return this thread's requests.Session, creating it on first use"""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+    return session
+
+# Coin prefix used by all trade.xyz (HIP-3 "xyz" dex) markets
+XYZ_PREFIX = "xyz:"
+
 # XYZ markets (all known equity perpetuals)
 XYZ_MARKETS = [
     "xyz:XYZ100", "xyz:TSLA", "xyz:NVDA", "xyz:PLTR", "xyz:META",
@@ -42,6 +58,12 @@ XYZ_MARKETS = [
 # XYZ markets launch date (approximate - trade.xyz launched around this time)
 XYZ_LAUNCH_DATE = datetime(2024, 10, 1)
 
+MS_PER_HOUR = 3_600_000
+
+def _now_ms() -> int:
+    """Current time as epoch milliseconds"""
+    return int(time.time() * 1000)
+
 def format_currency(amount: float) -> str:
     """Format number as currency"""
     if amount >= 1_000_000_000:
@@ -77,7 +99,7 @@ def get_user_fills_window(wallet_address: str, start_time: int, end_time: int) -
             "endTime": end_time
         }
 
-        response = requests.post(API_URL, json=payload, timeout=30)
+        response = _get_session().post(API_URL, json=payload, timeout=30)
 
         if response.status_code == 200:
             return response.json()
@@ -95,21 +117,53 @@ def get_user_fills_window(wallet_address: str, start_time: int, end_time: int) -
         print(f"⚠️  Unexpected error: {e}")
         return None
 
+def _run_concurrently(*calls: Tuple) -> List:
+    """
+    Run independent (func, *args) calls on daemon threads, return results in order
+    Daemon threads don't hold up interpreter exit, so Ctrl-C stops the tracker
+    right away instead of waiting for in-flight requests to time out
+    """
+    results = [None] * len(calls)
+    errors = [None] * len(calls)
+
+    def worker(i, func, args):
+        try:
+            results[i] = func(*args)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [
+        threading.Thread(target=worker, args=(i, call[0], call[1:]), daemon=True)
+        for i, call in enumerate(calls)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        # Join in short slices so KeyboardInterrupt is delivered promptly on all platforms
+        while thread.is_alive():
+            thread.join(0.1)
+
+    for error in errors:
+        if error is not None:
+            raise error
+    return results
+
 def get_user_fills(wallet_address: str, hours_back: int = 24) -> Optional[List[Dict]]:
     """Get user's trade fills from Hyperliquid (simple mode)"""
-    end_time = int(datetime.now().timestamp() * 1000)
-    start_time = int((datetime.now() - timedelta(hours=hours_back)).timestamp() * 1000)
+    end_time = _now_ms()
+    start_time = end_time - int(hours_back * MS_PER_HOUR)
     return get_user_fills_window(wallet_address, start_time, end_time)
 
-def get_historical_fills(wallet_address: str, start_date: Optional[datetime] = None) -> List[Dict]:
+def iter_historical_fills(wallet_address: str, start_date: Optional[datetime] = None) -> Iterator[Dict]:
     """
-    Get all historical fills by querying in chunks
-    Handles the 10k fill limit by breaking into weekly windows
+    Yield all historical XYZ fills by querying in chunks
+    Handles the 10k fill limit by breaking into weekly windows; each window's
+    fills are yielded as soon as it is fetched, so a consumer that aggregates
+    as it goes (e.g. calculate_historical_stats) never holds more than one window
     """
     if start_date is None:
         start_date = XYZ_LAUNCH_DATE
 
-    all_fills = []
     current_time = datetime.now()
 
     # Calculate total weeks to query
@@ -122,6 +176,7 @@ def get_historical_fills(wallet_address: str, start_date: Optional[datetime] = N
     # Query in 7-day chunks (working backwards from now)
     window_start = current_time
     week_num = 0
+    total_fills = 0
 
     while window_start > start_date:
         week_num += 1
@@ -140,16 +195,21 @@ def get_historical_fills(wallet_address: str, start_date: Optional[datetime] = N
             continue
 
         # Filter for XYZ markets only
-        xyz_fills = [f for f in fills if f.get("coin", "").startswith("xyz:")]
-        all_fills.extend(xyz_fills)
+        xyz_fills = [f for f in fills if f.get("coin", "").startswith(XYZ_PREFIX)]
+        total_fills += len(xyz_fills)
 
         print(f"✓ {len(xyz_fills)} XYZ fills")
 
+        yield from xyz_fills
+
         # Rate limit protection
         time.sleep(0.5)
 
-    print(f"\n✅ Fetched {len(all_fills)} total XYZ fills across {week_num} weeks")
-    return all_fills
+    print(f"\n✅ Fetched {total_fills} total XYZ fills across {week_num} weeks")
+
+def get_historical_fills(wallet_address: str, start_date: Optional[datetime] = None) -> List[Dict]:
+    """Get all historical XYZ fills as a list (see iter_historical_fills)"""
+    return list(iter_historical_fills(wallet_address, start_date))
 
 def get_xyz_market_volumes() -> Optional[Dict[str, float]]:
     """Get current 24h volume for all XYZ markets"""
@@ -159,7 +219,7 @@ def get_xyz_market_volumes() -> Optional[Dict[str, float]]:
             "dex": "xyz"
         }
 
-        response = requests.post(API_URL, json=payload, timeout=30)
+        response = _get_session().post(API_URL, json=payload, timeout=30)
 
         if response.status_code != 200:
             print(f"⚠️  Failed to fetch XYZ market data: {response.status_code}")
@@ -172,15 +232,12 @@ def get_xyz_market_volumes() -> Optional[Dict[str, float]]:
         universe = metadata.get("universe", [])
 
         volumes = {}
-        for i, market in enumerate(universe):
-            if i >= len(asset_ctxs):
-                break
-
+        # universe and asset_ctxs are parallel lists; zip stops at the shorter one
+        for market, ctx in zip(universe, asset_ctxs):
             coin_name = market.get("name", "")
             is_delisted = market.get("isDelisted", False)
 
             if not is_delisted:
-                ctx = asset_ctxs[i]
                 day_volume = float(ctx.get('dayNtlVlm') or 0)
                 volumes[coin_name] = day_volume
 
@@ -190,6 +247,10 @@ def get_xyz_market_volumes() -> Optional[Dict[str, float]]:
         print(f"⚠️  Error fetching XYZ volumes: {e}")
         return None
 
+def fill_notional(fill: Dict) -> float:
+    """Notional value (price * |size|) of a single fill"""
+    return float(fill.get("px", 0)) * abs(float(fill.get("sz", 0)))
+
 def calculate_user_volume(fills: List[Dict]) -> Dict[str, any]:
     """Calculate user's volume by asset"""
     volume_by_asset = {}
@@ -200,12 +261,10 @@ def calculate_user_volume(fills: List[Dict]) -> Dict[str, any]:
         coin = fill.get("coin", "")
 
         # Only count XYZ markets
-        if not coin.startswith("xyz:"):
+        if not coin.startswith(XYZ_PREFIX):
             continue
 
-        px = float(fill.get("px", 0))
-        sz = abs(float(fill.get("sz", 0)))
-        volume = px * sz
+        volume = fill_notional(fill)
 
         if coin not in volume_by_asset:
             volume_by_asset[coin] = {"volume": 0, "trades": 0}
@@ -221,27 +280,64 @@ def calculate_user_volume(fills: List[Dict]) -> Dict[str, any]:
         "total_trades": total_trades
     }
 
-def calculate_airdrop_metrics(fills: List[Dict]) -> Dict:
-    """Calculate airdrop-specific metrics"""
-    if not fills:
-        return {
-            "total_volume": 0,
-            "total_trades": 0,
-            "days_active": 0,
-            "months_active": 0,
-            "total_days": 0,
-            "consistency_pct": 0,
-            "avg_daily_volume": 0,
-            "monthly_breakdown": {},
-            "daily_volumes": {},
-            "first_trade": None,
-            "last_trade": None
-        }
+def calculate_historical_stats(fills: Iterable[Dict]) -> Tuple[Dict, Dict]:
+    """
+    Calculate airdrop metrics and per-asset volume in a single pass
+    Returns (airdrop_metrics, user_stats) shaped like calculate_airdrop_metrics
+    and calculate_user_volume; fills is only iterated once
+    """
+    volume_by_asset = {}
+    total_volume = 0.0
+    total_trades = 0
+
+    # Group by day and month
+    daily_volumes = defaultdict(float)
+    monthly_volumes = defaultdict(float)
 
-    # Filter XYZ fills
-    xyz_fills = [f for f in fills if f.get("coin", "").startswith("xyz:")]
+    # Running bounds instead of collecting every timestamp
+    first_ts = None
+    last_ts = None
+
+    for fill in fills:
+        coin = fill.get("coin", "")
 
-    if not xyz_fills:
+        # Only count XYZ markets
+        if not coin.startswith(XYZ_PREFIX):
+            continue
+
+        # Compute notional once and reuse it for the totals and the buckets
+        volume = fill_notional(fill)
+        total_volume += volume
+        total_trades += 1
+
+        if coin not in volume_by_asset:
+            volume_by_asset[coin] = {"volume": 0, "trades": 0}
+
+        volume_by_asset[coin]["volume"] += volume
+        volume_by_asset[coin]["trades"] += 1
+
+        ts_ms = fill.get("time", 0)
+        if ts_ms == 0:
+            continue
+
+        if first_ts is None or ts_ms < first_ts:
+            first_ts = ts_ms
+        if last_ts is None or ts_ms > last_ts:
+            last_ts = ts_ms
+
+        date_key = datetime.fromtimestamp(ts_ms / 1000).strftime("%Y-%m-%d")
+        month_key = date_key[:7]  # "YYYY-MM" prefix, no second strftime
+
+        daily_volumes[date_key] += volume
+        monthly_volumes[month_key] += volume
+
+    user_stats = {
+        "by_asset": volume_by_asset,
+        "total_volume": total_volume,
+        "total_trades": total_trades
+    }
+
+    if total_trades == 0:
         return {
             "total_volume": 0,
             "total_trades": 0,
@@ -254,36 +350,12 @@ def calculate_airdrop_metrics(fills: List[Dict]) -> Dict:
             "daily_volumes": {},
             "first_trade": None,
             "last_trade": None
-        }
-
-    # Calculate volumes
-    total_volume = sum(float(f.get("px", 0)) * abs(float(f.get("sz", 0))) for f in xyz_fills)
-    total_trades = len(xyz_fills)
-
-    # Group by day and month
-    daily_volumes = defaultdict(float)
-    monthly_volumes = defaultdict(float)
-
-    timestamps = []
-
-    for fill in xyz_fills:
-        ts_ms = fill.get("time", 0)
-        if ts_ms == 0:
-            continue
-
-        timestamps.append(ts_ms)
-        dt = datetime.fromtimestamp(ts_ms / 1000)
-        date_key = dt.strftime("%Y-%m-%d")
-        month_key = dt.strftime("%Y-%m")
-
-        volume = float(fill.get("px", 0)) * abs(float(fill.get("sz", 0)))
-        daily_volumes[date_key] += volume
-        monthly_volumes[month_key] += volume
+        }, user_stats
 
     # Calculate time range
-    if timestamps:
-        first_trade = datetime.fromtimestamp(min(timestamps) / 1000)
-        last_trade = datetime.fromtimestamp(max(timestamps) / 1000)
+    if first_ts is not None:
+        first_trade = datetime.fromtimestamp(first_ts / 1000)
+        last_trade = datetime.fromtimestamp(last_ts / 1000)
         total_days = max((last_trade - first_trade).days, 1)
     else:
         first_trade = None
@@ -295,7 +367,7 @@ def calculate_airdrop_metrics(fills: List[Dict]) -> Dict:
     consistency_pct = (days_active / total_days * 100) if total_days > 0 else 0
     avg_daily_volume = total_volume / days_active if days_active > 0 else 0
 
-    return {
+    airdrop_metrics = {
         "total_volume": total_volume,
         "total_trades": total_trades,
         "days_active": days_active,
@@ -308,6 +380,11 @@ def calculate_airdrop_metrics(fills: List[Dict]) -> Dict:
         "first_trade": first_trade,
         "last_trade": last_trade
     }
+    return airdrop_metrics, user_stats
+
+def calculate_airdrop_metrics(fills: List[Dict]) -> Dict:
+    """Calculate airdrop-specific metrics"""
+    return calculate_historical_stats(fills)[0]
 
 def print_results(wallet: str, user_stats: Dict, market_volumes: Dict[str, float], hours: int):
     """Print formatted results (short-term mode)"""
@@ -431,13 +508,14 @@ def print_airdrop_results(wallet: str, airdrop_metrics: Dict, user_stats: Dict):
     print(f"{'Month':<12} {'Volume':<20} {'% of Total':<15}")
     print("-"*80)
 
-    sorted_months = sorted(airdrop_metrics['monthly_breakdown'].items(), reverse=True)
-    for month, volume in sorted_months[:12]:  # Show last 12 months
+    monthly_breakdown = airdrop_metrics['monthly_breakdown']
+    recent_months = heapq.nlargest(12, monthly_breakdown.items())
+    for month, volume in recent_months:  # Show last 12 months
         pct = (volume / airdrop_metrics['total_volume'] * 100) if airdrop_metrics['total_volume'] > 0 else 0
         print(f"{month:<12} {format_currency(volume):<20} {pct:.2f}%")
 
-    if len(sorted_months) > 12:
-        print(f"... and {len(sorted_months) - 12} more months")
+    if len(monthly_breakdown) > 12:
+        print(f"... and {len(monthly_breakdown) - 12} more months")
 
     # Asset breakdown
     print("\n📋 ASSET BREAKDOWN")
@@ -531,12 +609,9 @@ def main():
         print(f"Analyzing wallet: {wallet_address}")
         print(f"Mode: Historical all-time analysis")
 
-        # Get all historical fills
-        all_fills = get_historical_fills(wallet_address)
-
-        # Calculate metrics
-        airdrop_metrics = calculate_airdrop_metrics(all_fills)
-        user_stats = calculate_user_volume(all_fills)
+        # Stream historical fills straight into the single-pass aggregation
+        fills = iter_historical_fills(wallet_address)
+        airdrop_metrics, user_stats = calculate_historical_stats(fills)
 
         # Print airdrop-focused results
         print_airdrop_results(wallet_address, airdrop_metrics, user_stats)
@@ -547,9 +622,13 @@ def main():
         print(f"Timeframe: Last {hours_back} hours")
         print("\nFetching data from Hyperliquid...\n")
 
-        # Fetch user fills
+        # Fetch user fills and market volumes in parallel (independent requests)
         print("⏳ Getting your trade history...")
-        fills = get_user_fills(wallet_address, hours_back)
+        print("⏳ Getting XYZ market volumes...")
+        fills, market_volumes = _run_concurrently(
+            (get_user_fills, wallet_address, hours_back),
+            (get_xyz_market_volumes,)
+        )
 
         if fills is None:
             print("\n❌ Failed to fetch trade data. Please check:")
@@ -558,10 +637,6 @@ def main():
             print("  3. Hyperliquid API is accessible\n")
             sys.exit(1)
 
-        # Fetch market volumes
-        print("⏳ Getting XYZ market volumes...")
-        market_volumes = get_xyz_market_volumes()
-
         if market_volumes is None:
             print("\n❌ Failed to fetch market data\n")
             sys.exit(1)